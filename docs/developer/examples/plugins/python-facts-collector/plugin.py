@@ -5,108 +5,199 @@ This plugin demonstrates how to create custom facts collectors using Python
 and Pyodide for WebAssembly compilation.
 """
 
+import functools
 import json
-import platform
 import socket
-from typing import Dict, Any
+import time
+from typing import Any, Callable, Dict, Tuple
 
+# psutil is imported on first use by _get_psutil(): None until then, and
+# False once the import has failed.
+_psutil = None
+
+# Prefer a fast JSON encoder when one is installed, falling back to stdlib.
+# Results are UTF-8 encoded JSON bytes, which orjson produces directly and
+# which cross the Pyodide bridge without another encoding pass.
 try:
-    import psutil
-    HAS_PSUTIL = True
+    import orjson
+    _dumps = orjson.dumps
 except ImportError:
-    HAS_PSUTIL = False
-
-
-def get_facts_collectors() -> str:
-    """Return JSON array of facts collector definitions."""
-    collectors = [
-        {
-            "name": "python_system_info",
-            "config_schema": {
-                "type": "object",
-                "properties": {
-                    "include_cpu": {
-                        "type": "boolean",
-                        "default": True,
-                        "description": "Include CPU information"
-                    },
-                    "include_memory": {
-                        "type": "boolean",
-                        "default": True,
-                        "description": "Include memory information"
-                    }
+    try:
+        import ujson as _json_encoder
+    except ImportError:
+        _json_encoder = json
+
+    def _dumps(obj: Any) -> bytes:
+        return _json_encoder.dumps(obj).encode("utf-8")
+
+
+def to_str(data: bytes) -> str:
+    """Decode a JSON result for callers that expect a string."""
+    return data.decode("utf-8")
+
+
+# Last (epoch second, formatted timestamp) pair produced by _utc_timestamp().
+_last_timestamp: Tuple[int, str] = (-1, "")
+
+# Name prefixes identifying loopback interfaces across platforms.
+_LOOPBACK_PREFIXES = ("lo", "Loopback")
+
+# Interface enumeration is comparatively expensive, so results are reused
+# for a short window instead of being re-queried on every collection.
+_NET_CACHE_TTL = 2.0
+_net_cache: Dict[str, Tuple[float, Any]] = {}
+
+
+# Collector definitions never change at runtime, so serialize them once.
+_COLLECTORS = [
+    {
+        "name": "python_system_info",
+        "config_schema": {
+            "type": "object",
+            "properties": {
+                "include_cpu": {
+                    "type": "boolean",
+                    "default": True,
+                    "description": "Include CPU information"
+                },
+                "include_memory": {
+                    "type": "boolean",
+                    "default": True,
+                    "description": "Include memory information"
                 }
             }
-        },
-        {
-            "name": "python_network_interfaces",
-            "config_schema": {
-                "type": "object",
-                "properties": {
-                    "include_loopback": {
-                        "type": "boolean",
-                        "default": False,
-                        "description": "Include loopback interfaces"
-                    }
+        }
+    },
+    {
+        "name": "python_network_interfaces",
+        "config_schema": {
+            "type": "object",
+            "properties": {
+                "include_loopback": {
+                    "type": "boolean",
+                    "default": False,
+                    "description": "Include loopback interfaces"
                 }
             }
         }
-    ]
+    }
+]
+
+_COLLECTORS_JSON = _dumps(_COLLECTORS)
+
 
-    return json.dumps(collectors)
+def get_facts_collectors() -> bytes:
+    """Return JSON array of facts collector definitions."""
+    return _COLLECTORS_JSON
 
 
-def execute_facts_collector(name: str, config_json: str) -> str:
+def execute_facts_collector(name: str, config_json: str) -> bytes:
     """Execute a facts collector."""
     try:
         config = json.loads(config_json)
-
-        if name == "python_system_info":
-            return execute_system_info_collector(config)
-        elif name == "python_network_interfaces":
-            return execute_network_interfaces_collector(config)
-        else:
-            return json.dumps({
-                "error": f"Unknown collector: {name}"
-            })
     except Exception as e:
-        return json.dumps({
+        return _dumps({
             "error": f"Collector execution failed: {str(e)}"
         })
 
+    return _dumps(execute_facts_collector_obj(name, config))
+
+
+def execute_facts_collector_obj(name: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Execute a facts collector with an already decoded config.
+
+    Hosts that hold the config as a native object can call this directly to
+    skip the JSON round trip through execute_facts_collector().
+    """
+    collector = _COLLECTOR_DISPATCH.get(name)
+    if collector is None:
+        return {"error": f"Unknown collector: {name}"}
+
+    try:
+        return collector(config)
+    except Exception as e:
+        return {"error": f"Collector execution failed: {str(e)}"}
+
+
+def _get_psutil() -> Any:
+    """Import psutil on first use, returning False when it is unavailable.
+
+    Deferring the import keeps plugin start-up cheap for callers that never
+    collect CPU, memory or interface details.
+    """
+    global _psutil
+    if _psutil is None:
+        try:
+            # psutil records its CPU times baseline on import, so no extra
+            # cpu_percent() priming call is needed here; each non-blocking
+            # sample covers the time since the previous one (or the import).
+            import psutil
+            _psutil = psutil
+        except ImportError:
+            _psutil = False
+    return _psutil
+
+
+@functools.lru_cache(maxsize=1)
+def _get_cpu_static() -> Dict[str, Any]:
+    """Return CPU details that cannot change while the process is running."""
+    import platform
+
+    psutil = _get_psutil()
+    if psutil:
+        return {
+            "architecture": platform.machine(),
+            "cores": psutil.cpu_count(logical=True),
+            "physical_cores": psutil.cpu_count(logical=False),
+            "python_version": platform.python_version()
+        }
+    return {
+        "architecture": platform.machine(),
+        "cores": "psutil not available",
+        "python_version": platform.python_version()
+    }
+
+
+def _utc_timestamp() -> str:
+    """Return the current UTC time as ISO 8601, reformatted at most once a second."""
+    global _last_timestamp
+    now = int(time.time())
+    if now != _last_timestamp[0]:
+        _last_timestamp = (now, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)))
+    return _last_timestamp[1]
+
+
+def execute_system_info_collector(config: Dict[str, Any]) -> bytes:
+    """Collect basic system information as UTF-8 encoded JSON."""
+    return _dumps(execute_system_info_collector_raw(config))
+
 
-def execute_system_info_collector(config: Dict[str, Any]) -> str:
+def execute_system_info_collector_raw(config: Dict[str, Any]) -> Dict[str, Any]:
     """Collect basic system information using real APIs."""
     facts = {}
 
     if config.get("include_cpu", True):
-        if HAS_PSUTIL:
+        psutil = _get_psutil()
+        if psutil:
             try:
-                cpu_info = {
-                    "architecture": platform.machine(),
-                    "cores": psutil.cpu_count(logical=True),
-                    "physical_cores": psutil.cpu_count(logical=False),
-                    "cpu_percent": psutil.cpu_percent(interval=1),
-                    "python_version": platform.python_version()
+                facts["cpu"] = {
+                    **_get_cpu_static(),
+                    "cpu_percent": psutil.cpu_percent(interval=None)
                 }
-                facts["cpu"] = cpu_info
             except Exception as e:
                 facts["cpu"] = {"error": f"Failed to collect CPU info: {str(e)}"}
         else:
-            facts["cpu"] = {
-                "architecture": platform.machine(),
-                "cores": "psutil not available",
-                "python_version": platform.python_version()
-            }
+            facts["cpu"] = dict(_get_cpu_static())
 
     if config.get("include_memory", True):
-        if HAS_PSUTIL:
+        psutil = _get_psutil()
+        if psutil:
             try:
                 memory = psutil.virtual_memory()
                 facts["memory"] = {
-                    "total_gb": round(memory.total / (1024**3), 2),
-                    "available_gb": round(memory.available / (1024**3), 2),
-                    "used_gb": round(memory.used / (1024**3), 2),
+                    "total_bytes": memory.total,
+                    "available_bytes": memory.available,
+                    "used_bytes": memory.used,
                     "used_percent": memory.percent
                 }
             except Exception as e:
@@ -115,15 +206,48 @@ def execute_system_info_collector(config: Dict[str, Any]) -> str:
             facts["memory"] = {"error": "psutil not available for memory collection"}
 
     # Add timestamp
-    from datetime import datetime
-    facts["timestamp"] = datetime.utcnow().isoformat() + "Z"
+    facts["timestamp"] = _utc_timestamp()
+
+    return facts
+
+
+@functools.lru_cache(maxsize=1)
+def _get_hostname() -> str:
+    """Return the host name, which does not change for the process lifetime."""
+    return socket.gethostname()
+
+
+def _get_cached(key: str, fetch: Callable[[], Any], ttl: float = _NET_CACHE_TTL) -> Any:
+    """Return the cached result of fetch(), refreshing it once ttl seconds pass."""
+    now = time.monotonic()
+    entry = _net_cache.get(key)
+    if entry is not None and now - entry[0] < ttl:
+        return entry[1]
+
+    value = fetch()
+    _net_cache[key] = (now, value)
+    return value
 
-    return json.dumps(facts)
 
+def _is_loopback_address(address: str) -> bool:
+    """Return whether an IPv4 or IPv6 address string is a loopback address."""
+    return address.startswith("127.") or address == "::1"
 
-def execute_network_interfaces_collector(config: Dict[str, Any]) -> str:
+
+def execute_network_interfaces_collector(config: Dict[str, Any]) -> bytes:
+    """Collect network interface information as UTF-8 encoded JSON."""
+    return _dumps(execute_network_interfaces_collector_raw(config))
+
+
+def execute_network_interfaces_collector_raw(config: Dict[str, Any]) -> Dict[str, Any]:
     """Collect network interface information using socket APIs."""
     include_loopback = config.get("include_loopback", False)
+    psutil = _get_psutil()
+
+    # Bind module attributes used inside the per-interface loops to locals
+    ip_families = (socket.AF_INET, socket.AF_INET6)
+    af_link = psutil.AF_LINK if psutil else None
+    loopback_prefixes = _LOOPBACK_PREFIXES
 
     try:
         interfaces = {}
@@ -131,15 +255,17 @@ def execute_network_interfaces_collector(config: Dict[str, Any]) -> str:
         # Get network interface information
         if hasattr(socket, 'getaddrinfo') and hasattr(socket, 'gethostname'):
             try:
-                hostname = socket.gethostname()
+                hostname = _get_hostname()
                 interfaces["hostname"] = hostname
 
                 # Get IP addresses for hostname
                 try:
-                    addr_info = socket.getaddrinfo(hostname, None)
+                    addr_info = _get_cached(
+                        "addr_info", lambda: socket.getaddrinfo(hostname, None)
+                    )
                     ip_addresses = list(set(
                         addr[4][0] for addr in addr_info
-                        if addr[4][0] not in ('127.0.0.1', '::1') or include_loopback
+                        if include_loopback or not _is_loopback_address(addr[4][0])
                     ))
                     interfaces["hostname_ips"] = ip_addresses
                 except Exception:
@@ -149,114 +275,149 @@ def execute_network_interfaces_collector(config: Dict[str, Any]) -> str:
                 interfaces["hostname"] = f"error: {str(e)}"
 
         # Try to get more detailed interface info with psutil if available
-        if HAS_PSUTIL:
+        if psutil:
             try:
-                net_if_addrs = psutil.net_if_addrs()
-                net_if_stats = psutil.net_if_stats()
+                net_if_addrs = _get_cached("net_if_addrs", psutil.net_if_addrs)
+                net_if_stats = _get_cached("net_if_stats", psutil.net_if_stats)
 
                 for interface_name, addrs in net_if_addrs.items():
-                    if not include_loopback and interface_name.startswith(('lo', 'Loopback')):
+                    # Skip ignored interfaces before doing any per-address work
+                    if not addrs or (
+                        not include_loopback and interface_name.startswith(loopback_prefixes)
+                    ):
                         continue
 
-                    interface_info = {
-                        "addresses": [],
-                        "mac": None,
-                        "status": "unknown"
+                    stats = net_if_stats.get(interface_name)
+                    interfaces[interface_name] = {
+                        "addresses": [addr.address for addr in addrs if addr.family in ip_families],
+                        "mac": next((addr.address for addr in addrs if addr.family == af_link), None),
+                        "status": ("up" if stats.isup else "down") if stats else "unknown",
+                        "mtu": stats.mtu if stats else None
                     }
 
-                    for addr in addrs:
-                        if addr.family == socket.AF_INET:
-                            interface_info["addresses"].append(addr.address)
-                        elif addr.family == socket.AF_INET6:
-                            interface_info["addresses"].append(addr.address)
-                        elif addr.family == psutil.AF_LINK:
-                            interface_info["mac"] = addr.address
-
-                    # Get interface status
-                    if interface_name in net_if_stats:
-                        stats = net_if_stats[interface_name]
-                        interface_info["status"] = "up" if stats.isup else "down"
-                        interface_info["mtu"] = stats.mtu
-
-                    interfaces[interface_name] = interface_info
-
             except Exception as e:
                 interfaces["psutil_error"] = str(e)
 
         # Fallback if psutil is not available
-        if not HAS_PSUTIL or len(interfaces) <= 2:  # Only hostname info
+        if not psutil or len(interfaces) <= 2:  # Only hostname info
             # Basic fallback using socket
             try:
-                # Get local IP (this is a simplified approach)
-                s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                s.connect(("8.8.8.8", 80))
-                local_ip = s.getsockname()[0]
-                s.close()
+                # Use the host name addresses rather than opening a probe
+                # socket; /etc/hosts often maps the host name to loopback, so
+                # prefer a non-loopback address and only fall back to loopback
+                # when it was requested.
+                addresses = interfaces.get("hostname_ips") or [
+                    _get_cached("local_ip", lambda: socket.gethostbyname(_get_hostname()))
+                ]
+                addresses = sorted(addresses, key=_is_loopback_address)
+                if not include_loopback:
+                    addresses = [ip for ip in addresses if not _is_loopback_address(ip)]
+                local_ip = addresses[0] if addresses else None
+            except Exception:
+                local_ip = None
 
+            if local_ip is not None:
                 interfaces["primary_interface"] = {
                     "addresses": [local_ip],
                     "mac": "unknown (psutil not available)",
                     "status": "up"
                 }
-            except Exception:
+            else:
                 interfaces["network_info"] = "Limited network info available (psutil not installed)"
 
-        return json.dumps(interfaces)
+            # Interface names are still available on POSIX without psutil
+            if hasattr(socket, 'if_nameindex'):
+                try:
+                    interfaces["interface_names"] = [
+                        interface_name
+                        for _, interface_name in _get_cached("if_nameindex", socket.if_nameindex)
+                        if include_loopback or not interface_name.startswith(loopback_prefixes)
+                    ]
+                except OSError:
+                    pass
+
+        return interfaces
 
     except Exception as e:
-        return json.dumps({
+        return {
             "error": f"Failed to collect network interface information: {str(e)}"
-        })
+        }
+
+
+# Maps collector names to their implementations
+_COLLECTOR_DISPATCH = {
+    "python_system_info": execute_system_info_collector_raw,
+    "python_network_interfaces": execute_network_interfaces_collector_raw,
+}
 
 
 # Other required plugin functions (return empty arrays)
-def get_task_definitions() -> str:
+def get_task_definitions() -> bytes:
     """Return empty array - no tasks in this plugin."""
-    return "[]"
+    return b"[]"
 
 
-def get_template_extensions() -> str:
+def get_template_extensions() -> bytes:
     """Return empty array - no template extensions in this plugin."""
-    return "[]"
+    return b"[]"
 
 
-def get_log_sources() -> str:
+def get_log_sources() -> bytes:
     """Return empty array - no log sources in this plugin."""
-    return "[]"
+    return b"[]"
 
 
-def get_log_parsers() -> str:
+def get_log_parsers() -> bytes:
     """Return empty array - no log parsers in this plugin."""
-    return "[]"
+    return b"[]"
 
 
-def get_log_filters() -> str:
+def get_log_filters() -> bytes:
     """Return empty array - no log filters in this plugin."""
-    return "[]"
+    return b"[]"
 
 
-def get_log_outputs() -> str:
+def get_log_outputs() -> bytes:
     """Return empty array - no log outputs in this plugin."""
-    return "[]"
+    return b"[]"
 
 
 # WebAssembly/JavaScript interop (for Pyodide)
-def _setup_js_bindings():
-    """Set up JavaScript bindings for WASM environment."""
-    # This would be handled by Pyodide's JavaScript interop
-    pass
+def _setup_js_bindings() -> Dict[str, Callable[..., Any]]:
+    """Set up JavaScript bindings for WASM environment.
+
+    Wraps the dict-returning collector entry points so arguments arrive as
+    Python objects and results are handed to JavaScript via to_js(), which
+    is cheaper than a JSON round trip. Returns an empty mapping outside
+    Pyodide.
+    """
+    try:
+        from js import Object
+        from pyodide.ffi import to_js
+    except ImportError:
+        return {}
+
+    def export(func: Callable[..., Any]) -> Callable[..., Any]:
+        def wrapper(*args: Any) -> Any:
+            args = tuple(arg.to_py() if hasattr(arg, "to_py") else arg for arg in args)
+            return to_js(func(*args), dict_converter=Object.fromEntries)
+        return wrapper
+
+    return {
+        "execute_facts_collector_obj": export(execute_facts_collector_obj),
+        "execute_system_info_collector_raw": export(execute_system_info_collector_raw),
+        "execute_network_interfaces_collector_raw": export(execute_network_interfaces_collector_raw),
+    }
 
 
 if __name__ == "__main__":
     # Test the plugin functions
-    print("Facts collectors:", get_facts_collectors())
+    print("Facts collectors:", to_str(get_facts_collectors()))
 
     # Test system info collector
-    config = json.dumps({"include_cpu": True, "include_memory": True})
-    result = execute_facts_collector("python_system_info", config)
+    result = execute_system_info_collector_raw({"include_cpu": True, "include_memory": True})
     print("System info:", result)
 
     # Test network interfaces collector
-    config = json.dumps({"include_loopback": False})
-    result = execute_facts_collector("python_network_interfaces", config)
-    print("Network interfaces:", result)
\ No newline at end of file
+    result = execute_network_interfaces_collector_raw({"include_loopback": False})
+    print("Network interfaces:", result)
@@ -0,0 +1,27 @@
+"""
+Optional native build of the Python facts collector plugin.
+
+Compiles plugin.py with Cython so that hosts can import a C extension
+instead of the interpreted module. The same build runs natively for CPython
+hosts or through emscripten via `pyodide build` for WebAssembly.
+
+Usage:
+    make native   # python setup.py build_ext --inplace
+    make wasm     # pyodide build --outdir dist
+"""
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="driftless-python-facts-collector",
+    # Annotations are documentation only: without annotation_typing=False,
+    # Cython enforces them as exact types and rejects inputs such as bytes
+    # configs or dict subclasses that the pure-Python module accepts.
+    ext_modules=cythonize(
+        "plugin.py",
+        language_level=3,
+        annotate=True,
+        compiler_directives={"annotation_typing": False},
+    ),
+)